@@ -1,231 +1,111 @@
-                    import streamlit as st
+import streamlit as st
 from datetime import datetime
-import io
-import base64
-from typing import List, Dict, Tuple, Any, Set, Optional
+from typing import List, Dict, Tuple, Any, Set, Optional, Sequence
+
+from report import generate_print_friendly_html
+from rotation import STATIONS, compute_pairs, stations_from_mask, to_mask
 
 # --- Configuration Constants ---
-LINES: List[str] = ['B', 'C', 'L', 'M', 'N', 'O']
-STATIONS: List[int] = list(range(1, 21))
+LINES: Tuple[str, ...] = ('B', 'C', 'L', 'M', 'N', 'O')
 
-# For HTML output columns
-LINES_FIRST_COLUMN_HTML: List[str] = ['B', 'C', 'L']
-LINES_SECOND_COLUMN_HTML: List[str] = ['M', 'N', 'O']
+# Widget keys carry the day they belong to, so yesterday's selections are simply never read again
+NON_OP_KEY_TEMPLATE: str = "non_op_{line}_{date}"
+ACCOM_KEY_TEMPLATE: str = "accommodation_stations_c_{date}"
 
 # --- Core Logic Class ---
 class ProductionRotation:
     """Handles the logic for generating station rotation pairs."""
     def __init__(self) -> None:
-        self.lines: List[str] = LINES
-        self.stations: List[int] = STATIONS
-        self.non_operational_stations: Dict[str, List[int]] = {}
-        self.fixed_stations: Dict[str, List[int]] = {}
+        self.lines: Tuple[str, ...] = LINES
+        # Station membership is stored as int bitmasks: bit s is set when station s is in the set.
+        self.non_op_masks: Dict[str, int] = {}
+        self.fixed_masks: Dict[str, int] = {}
+
+    @property
+    def non_operational_stations(self) -> Dict[str, List[int]]:
+        return {line: stations_from_mask(mask) for line, mask in self.non_op_masks.items()}
 
     def set_non_operational(self, line: str, stations: List[int]) -> None:
-        self.non_operational_stations[line] = sorted(list(set(stations)))
+        self.non_op_masks[line] = to_mask(stations)
 
     def set_fixed(self, line: str, stations: List[int]) -> None:
-        self.fixed_stations[line] = sorted(list(set(stations)))
-
-    def get_operational_stations(self, line: str) -> List[int]:
-        non_op_for_line: List[int] = self.non_operational_stations.get(line, [])
-        return sorted([s for s in self.stations if s not in non_op_for_line])
+        self.fixed_masks[line] = to_mask(stations)
 
     def generate_pairs(self, line: str) -> List[str]:
-        pairs: List[str] = []
-        if line == 'C':
-            fixed_c_stations_input: List[int] = self.fixed_stations.get('C', [])
-            valid_fixed_stations_for_pairing: List[int] = [s for s in fixed_c_stations_input if s in self.stations]
-            for s_fixed in valid_fixed_stations_for_pairing:
-                pairs.append(f"{s_fixed}-{s_fixed}")
-            non_op_for_c: List[int] = self.non_operational_stations.get('C', [])
-            remaining_for_mirror_pairing_c: List[int] = [
-                s for s in self.stations 
-                if s not in valid_fixed_stations_for_pairing and s not in non_op_for_c
-            ]
-            if not remaining_for_mirror_pairing_c and not valid_fixed_stations_for_pairing:
-                return [] 
-            if remaining_for_mirror_pairing_c: 
-                pairs.extend(self.mirror_pair(remaining_for_mirror_pairing_c))
-            return pairs
-        operational_stations: List[int] = self.get_operational_stations(line)
-        if not operational_stations:
-            return []
-        return self.mirror_pair(operational_stations)
-
-    def mirror_pair(self, stations_to_pair: List[int]) -> List[str]:
-        sorted_stations: List[int] = sorted(list(set(stations_to_pair))) 
-        pairs: List[str] = []
-        n: int = len(sorted_stations)
-        for i in range(n // 2):
-            pairs.append(f"{sorted_stations[i]}-{sorted_stations[n - 1 - i]}")
-        if n % 2 != 0: 
-            middle_index: int = n // 2
-            pairs.append(f"{sorted_stations[middle_index]}-{sorted_stations[middle_index]}")
-        return pairs
-
-    def generate_schedule(self) -> Tuple[str, Dict[str, List[str]]]:
-        date_str: str = datetime.now().strftime("%m/%d/%Y")
+        return list(compute_pairs(line, self.non_op_masks.get(line, 0), self.fixed_masks.get(line, 0)))
+
+    def compute(
+        self,
+        non_op_by_line: Dict[str, List[int]],
+        fixed_c: List[int],
+        date_str: Optional[str] = None
+    ) -> Tuple[str, Dict[str, List[str]]]:
+        """Replaces all station selections in one pass and returns the schedule for them."""
+        self.non_op_masks = {line_code: to_mask(non_op_by_line.get(line_code, ())) for line_code in self.lines}
+        self.fixed_masks = {'C': to_mask(fixed_c)}
+        return self.generate_schedule(date_str)
+
+    def generate_schedule(self, date_str: Optional[str] = None) -> Tuple[str, Dict[str, List[str]]]:
+        """Returns (display date, pairs per line); `date_str` defaults to today as MM/DD/YYYY."""
+        if date_str is None:
+            date_str = datetime.now().strftime("%m/%d/%Y")
         schedule_data: Dict[str, List[str]] = {}
         for line_code in self.lines:
             schedule_data[line_code] = self.generate_pairs(line_code)
         return date_str, schedule_data
 
 # --- Session State Management ---
-def initialize_session_state() -> None:
+def initialize_session_state(current_date_str: Optional[str] = None) -> None:
     """
     Initializes or resets session state variables, especially on a new day.
-    This version performs a daily reset.
+    This version performs a daily reset; `current_date_str` is today's date as YYYY-MM-DD
+    and is read from the clock when not supplied.
     """
-    current_date_str: str = datetime.now().strftime("%Y-%m-%d")
+    if current_date_str is None:
+        current_date_str = datetime.now().strftime("%Y-%m-%d")
     if 'last_date' not in st.session_state or st.session_state.last_date != current_date_str:
         st.session_state.last_date = current_date_str
         st.session_state.non_operational = {line: [] for line in LINES} 
         st.session_state.accommodation_c = [] 
-        
-        for line_code in LINES:
-            st.session_state[f"non_op_{line_code}"] = [] 
-        st.session_state["accommodation_stations_c"] = [] 
 
     if 'non_operational' not in st.session_state:
         st.session_state.non_operational = {line: [] for line in LINES}
     if 'accommodation_c' not in st.session_state:
         st.session_state.accommodation_c = []
-    
-    if "accommodation_stations_c" not in st.session_state:
-        st.session_state.accommodation_stations_c = []
-    for line_code in LINES:
-        if f"non_op_{line_code}" not in st.session_state:
-            st.session_state[f"non_op_{line_code}"] = []
 
-def update_session_state_after_submit() -> None:
-    """Updates main logic-driving session state variables based on widget inputs."""
-    for line_code in LINES:
-        st.session_state.non_operational[line_code] = st.session_state.get(f"non_op_{line_code}", [])
-    st.session_state.accommodation_c = st.session_state.get("accommodation_stations_c", [])
-
-# --- HTML Generation --- 
-def _render_column_html(
-    column_lines: List[str], 
-    schedule: Dict[str, List[str]], 
-    down_stations_data: Dict[str, List[int]]
-) -> str:
-    """Helper function to render HTML for a single column of lines."""
-    column_html = ""
-    for line_code in column_lines: 
-        column_html += f'<div class="line-group"><div class="line-title">Line {line_code}</div><div class="pairs">'
-        has_content_for_line: bool = False 
-        if schedule.get(line_code): 
-            for pair_text in schedule[line_code]:
-                column_html += f'<div class="pair">{pair_text}</div>'
-            has_content_for_line = True
-        current_line_down_stations: List[int] = down_stations_data.get(line_code, [])
-        if current_line_down_stations:
-            down_stations_str: str = ', '.join(map(str, sorted(current_line_down_stations)))
-            column_html += f'<div class="pair down-station-item">{down_stations_str}</div>'
-            has_content_for_line = True 
-        if not has_content_for_line: 
-             column_html += '<div class="empty-message">No pairs or unavailable stations</div>'
-        column_html += '</div></div>' 
-    return column_html
-
-def generate_print_friendly_html(date: str, schedule: Dict[str, List[str]], down_stations_data: Dict[str, List[int]]) -> str:
-    """Generates the full HTML string for the print-friendly report."""
-    
-    watermark_text = "jerjerry is the best 💙"
-    
-    svg_string = f'''<svg width="200" height="130" xmlns="http://www.w3.org/2000/svg">
-      <text x="50%" y="50%" dominant-baseline="middle" text-anchor="middle" 
-        transform="rotate(-35 100 65)" 
-        style="font-size: 14px; font-weight: 600; fill: #000; opacity: 0.15; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif;">
-        {watermark_text}
-      </text>
-    </svg>'''
-    
-    svg_bytes = svg_string.encode('utf-8')
-    b64_svg = base64.b64encode(svg_bytes).decode('utf-8')
-    data_uri = f"data:image/svg+xml;base64,{b64_svg}"
-
-    css_styles = f"""
-        <style>
-            @media print {{ 
-                @page {{ size: A4; margin: 10mm; }} 
-                body {{ margin: 0; -webkit-print-color-adjust: exact; print-color-adjust: exact; }} 
-                .no-print {{ display: none !important; }} 
-                .full-page-watermark {{ display: block !important; }}
-            }}
-            body {{ 
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif; 
-                background-color: white; 
-                color: #1c1c1e; 
-                font-size: 10pt; 
-                margin: 10mm; 
-                line-height: 1.2; 
-                position: relative;
-            }}
-            .container {{ max-width: 100%; box-sizing: border-box; position: relative; z-index: 1; }}
-            .header {{ text-align: center; margin-bottom: 8mm; padding-bottom: 4mm; border-bottom: 1px solid #d1d1d6; }}
-            .title {{ font-size: 16pt; font-weight: bold; margin: 0; text-transform: uppercase; color: #1c1c1e; }}
-            .date {{ font-size: 10pt; margin: 3mm 0; color: #8e8e93; }}
-            .columns {{ display: flex; justify-content: space-between; gap: 8mm; }}
-            .column {{ flex: 1; max-width: 48%; }}
-            .line-group {{ margin-bottom: 6mm; page-break-inside: avoid; }}
-            .line-title {{ font-size: 12pt; font-weight: 600; text-align: center; margin-bottom: 3mm; padding: 2mm 4mm; background-color: #f2f2f7; text-transform: uppercase; color: #1c1c1e; border-radius: 4px; }}
-            .pairs {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(80px, 1fr)); gap: 3mm; padding: 0 2mm; }}
-            .pair {{ padding: 3mm 4mm; border: 1px solid #d1d1d6; border-radius: 4px; font-size: 10pt; text-align: center; background-color: white; color: #1c1c1e; }}
-            .pair.down-station-item {{ background-color: #fdecea; color: #c0392b; border-color: #c0392b; }}
-            .empty-message {{ font-style: italic; color: #8e8e93; text-align: center; padding: 3mm; font-size: 10pt; grid-column: 1 / -1; }}
-            
-            .full-page-watermark {{
-                position: fixed; 
-                top: 0;
-                left: 0;
-                width: 100%;
-                height: 100%;
-                z-index: -1;
-                pointer-events: none;
-                background-image: url('{data_uri}');
-                background-repeat: repeat;
-            }}
-        </style>
+def get_widget_keys(current_date_str: str) -> Tuple[Dict[str, str], str]:
     """
-    
-    html_content = f"""
-    <!DOCTYPE html>
-    <html lang='en'>
-    <head>
-        <meta charset='UTF-8'>
-        <meta name='viewport' content='width=device-width, initial-scale=1.0'>
-        <title>Station Rotation - {date}</title>
-        {css_styles}
-    </head>
-    <body>
-        <div class='full-page-watermark'></div>
-        <div class='container'>
-            <div class='header'> <div class='title'>Station Rotation</div> <div class='date'>Date: {date}</div> </div>
-            <div class='columns'>
-                <div class='column'>
-                    {_render_column_html(LINES_FIRST_COLUMN_HTML, schedule, down_stations_data)}
-                </div>
-                <div class='column'>
-                    {_render_column_html(LINES_SECOND_COLUMN_HTML, schedule, down_stations_data)}
-                </div>
-            </div>
-        </div>
-    </body>
-    </html>"""
-    return html_content
+    Returns (per-line 'Unavailable' keys, Line C 'Accommodations' key) for the given day.
+    A new day gets fresh keys, so the widgets start empty and Streamlit drops the stale ones.
+    """
+    non_op_keys: Dict[str, str] = {line: NON_OP_KEY_TEMPLATE.format(line=line, date=current_date_str) for line in LINES}
+    return non_op_keys, ACCOM_KEY_TEMPLATE.format(date=current_date_str)
+
+def update_session_state_after_submit(non_op_keys: Dict[str, str], accommodation_key: str) -> None:
+    """Updates main logic-driving session state variables based on widget inputs."""
+    for line_code, widget_key in non_op_keys.items():
+        st.session_state.non_operational[line_code] = st.session_state.get(widget_key, [])
+    st.session_state.accommodation_c = st.session_state.get(accommodation_key, [])
 
 # --- UI Rendering Helper Functions ---
+# Form labels and help texts for each line's inputs (rebuilt on every rerun; they are a few short strings).
+LINE_LABELS: Dict[str, str] = {line: f"Line {line}" for line in LINES}
+UNAVAILABLE_HELP_TEXTS: Dict[str, str] = {
+    line: f"Select stations on Line {line} that are broken or cannot be used today." for line in LINES
+}
+UNAVAILABLE_HELP_TEXTS['C'] = "Select stations on Line C that are broken or cannot be used today. Cannot be an accommodated station."
+ACCOMMODATION_HELP_TEXT: str = "Select stations for operators who will remain at their current station (e.g., for '1-1' type pairings)."
+
 def _render_line_input_row(
     primary_label_text: str, 
     secondary_label_text: str,
     widget_key: str,
-    options: List[int],
+    options: Sequence[int],
     help_text: str,
     col_widths: List[int] = [2,5], 
     is_line_c_unavailable: bool = False, 
-    all_stations: Optional[List[int]] = None 
+    all_stations: Optional[Sequence[int]] = None,
+    accommodation_key: Optional[str] = None
     ) -> None:
     """Helper function to render a two-column input row for a line."""
     col_label, col_widget = st.columns(col_widths)
@@ -237,9 +117,10 @@ def _render_line_input_row(
             
     with col_widget:
         widget_options = options
-        if is_line_c_unavailable and all_stations is not None:
-            currently_accommodated_c: List[int] = st.session_state.get("accommodation_stations_c", [])
-            widget_options = [s for s in all_stations if s not in currently_accommodated_c]
+        if is_line_c_unavailable and all_stations is not None and accommodation_key is not None:
+            currently_accommodated_c: List[int] = st.session_state.get(accommodation_key, [])
+            accommodated_c_mask: int = to_mask(currently_accommodated_c)
+            widget_options = [s for s in all_stations if not (accommodated_c_mask >> s) & 1]
             
             if not widget_options:
                 if currently_accommodated_c:
@@ -256,8 +137,14 @@ def _render_line_input_row(
         )
 
 # --- Main Application UI and Logic Flow ---
-def render_configuration_form(all_stations_for_multiselect: List[int]) -> bool:
+def render_configuration_form(
+        all_stations_for_multiselect: Sequence[int],
+        non_op_keys: Dict[str, str],
+        accommodation_key: str
+    ) -> bool:
     """Renders the main configuration form and returns the submission status."""
+    # Keeping every input inside the form means editing selections does not rerun the script;
+    # only the submit button does, so the schedule/HTML path runs once per submission.
     with st.form(key="station_config_form", clear_on_submit=False):
         st.header("Station Configuration")
         st.caption("Specify unavailable stations and Line C accommodations.")
@@ -268,28 +155,29 @@ def render_configuration_form(all_stations_for_multiselect: List[int]) -> bool:
         for line_key in LINES: 
             if line_key == 'C':
                 _render_line_input_row(
-                    primary_label_text="Line C",
+                    primary_label_text=LINE_LABELS[line_key],
                     secondary_label_text="Accommodations",
-                    widget_key="accommodation_stations_c",
+                    widget_key=accommodation_key,
                     options=all_stations_for_multiselect,
-                    help_text="Select stations for operators who will remain at their current station (e.g., for '1-1' type pairings)."
+                    help_text=ACCOMMODATION_HELP_TEXT
                 )
                 _render_line_input_row(
                     primary_label_text="",
                     secondary_label_text="Unavailable",
-                    widget_key=f"non_op_{line_key}",
+                    widget_key=non_op_keys[line_key],
                     options=all_stations_for_multiselect, 
-                    help_text="Select stations on Line C that are broken or cannot be used today. Cannot be an accommodated station.",
+                    help_text=UNAVAILABLE_HELP_TEXTS[line_key],
                     is_line_c_unavailable=True,
-                    all_stations=all_stations_for_multiselect
+                    all_stations=all_stations_for_multiselect,
+                    accommodation_key=accommodation_key
                 )
             else: 
                 _render_line_input_row(
-                    primary_label_text=f"Line {line_key}",
+                    primary_label_text=LINE_LABELS[line_key],
                     secondary_label_text="Unavailable",
-                    widget_key=f"non_op_{line_key}",
+                    widget_key=non_op_keys[line_key],
                     options=all_stations_for_multiselect,
-                    help_text=f"Select stations on Line {line_key} that are broken or cannot be used today."
+                    help_text=UNAVAILABLE_HELP_TEXTS[line_key]
                 )
             st.write("")
 
@@ -324,21 +212,15 @@ def render_download_section(
     ) -> None:
     """Renders the download button and success/info messages."""
     down_stations_for_html: Dict[str, List[int]] = rotation_logic_handler.non_operational_stations 
-    has_any_pairs: bool = any(schedule_data.values())
-    has_any_down_stations: bool = any(down_stations_for_html.values())
-
-    if not has_any_pairs and not has_any_down_stations:
-        st.error("No operational stations for pairs and no unavailable stations selected. Cannot generate a meaningful schedule.")
-        return 
-    elif not has_any_pairs and has_any_down_stations:
-         st.info("No operational stations available for pairing. The report will show only the unavailable stations.")
-    
-    html_content: str = generate_print_friendly_html(current_date_display, schedule_data, down_stations_for_html)
-    html_buffer = io.BytesIO(html_content.encode('utf-8'))
+    # Every station not paired is unavailable, so a schedule without pairs always has down stations to show.
+    if not any(schedule_data.values()):
+        st.info("No operational stations available for pairing. The report will show only the unavailable stations.")
     
+    html_bytes: bytes = generate_print_friendly_html(current_date_display, schedule_data, down_stations_for_html)
+
     st.download_button(
         label="Click Here to Download HTML",
-        data=html_buffer,
+        data=html_bytes,
         file_name=f"station_rotation_{current_date_display.replace('/', '-')}.html",
         mime="text/html",
         use_container_width=True,
@@ -351,32 +233,34 @@ def main() -> None:
     st.set_page_config(page_title="Station Rotation", layout="wide")
     st.title("Station Rotation")
 
-    initialize_session_state() 
+    now: datetime = datetime.now()
+    current_date_str_for_display: str = now.strftime("%Y-%m-%d")
+    schedule_date_str: str = now.strftime("%m/%d/%Y")
+
+    initialize_session_state(current_date_str_for_display) 
     
-    rotation_logic_handler = ProductionRotation() 
-    all_stations_for_multiselect: List[int] = STATIONS 
+    all_stations_for_multiselect: Tuple[int, ...] = STATIONS 
 
-    current_date_str_for_display = datetime.now().strftime("%Y-%m-%d")
     if 'last_date' in st.session_state and st.session_state.last_date != current_date_str_for_display:
         st.info(
              f"Welcome! It's a new day ({current_date_str_for_display}). "
              f"The form has been reset for today's input."
         )
 
-    submitted = render_configuration_form(all_stations_for_multiselect)
+    non_op_keys, accommodation_key = get_widget_keys(current_date_str_for_display)
+    submitted = render_configuration_form(all_stations_for_multiselect, non_op_keys, accommodation_key)
 
     if submitted:
-        update_session_state_after_submit()
+        update_session_state_after_submit(non_op_keys, accommodation_key)
         
         if not validate_line_c_configuration():
             return 
 
         st.header("Download")
-        for line_code in LINES: 
-            rotation_logic_handler.set_non_operational(line_code, st.session_state.non_operational.get(line_code, []))
-        rotation_logic_handler.set_fixed('C', st.session_state.accommodation_c)
-
-        current_date_display, schedule_data = rotation_logic_handler.generate_schedule()
+        rotation_logic_handler = ProductionRotation()
+        current_date_display, schedule_data = rotation_logic_handler.compute(
+            st.session_state.non_operational, st.session_state.accommodation_c, schedule_date_str
+        )
         render_download_section(rotation_logic_handler, current_date_display, schedule_data)
         
     elif 'last_date' not in st.session_state or \
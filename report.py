@@ -0,0 +1,163 @@
+"""
+Print-friendly HTML report for a rotation schedule.
+
+Lives outside app.py so the pre-encoded layout below is built once per process: Streamlit re-executes
+the main script on every rerun, but imported modules stay cached in sys.modules.
+"""
+import base64
+import html
+from typing import List, Dict, Tuple
+
+import streamlit as st
+
+# --- Configuration Constants ---
+# For HTML output columns
+LINES_FIRST_COLUMN_HTML: Tuple[str, ...] = ('B', 'C', 'L')
+LINES_SECOND_COLUMN_HTML: Tuple[str, ...] = ('M', 'N', 'O')
+HTML_COLUMNS: Tuple[Tuple[str, ...], ...] = (LINES_FIRST_COLUMN_HTML, LINES_SECOND_COLUMN_HTML)
+
+# --- HTML Generation ---
+_WATERMARK_TEXT: str = "jerjerry is the best 💙"
+
+_WATERMARK_SVG: str = f'''<svg width="200" height="130" xmlns="http://www.w3.org/2000/svg">
+      <text x="50%" y="50%" dominant-baseline="middle" text-anchor="middle" 
+        transform="rotate(-35 100 65)" 
+        style="font-size: 14px; font-weight: 600; fill: #000; opacity: 0.15; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif;">
+        {_WATERMARK_TEXT}
+      </text>
+    </svg>'''
+
+_WATERMARK_DATA_URI: str = "data:image/svg+xml;base64," + base64.b64encode(_WATERMARK_SVG.encode('utf-8')).decode('utf-8')
+
+# Encoded once when this module is first imported and emitted as-is, so the CSS never passes through str.format per render.
+_CSS_HTML: bytes = f"""
+        <style>
+            @media print {{ 
+                @page {{ size: A4; margin: 10mm; }} 
+                body {{ margin: 0; -webkit-print-color-adjust: exact; print-color-adjust: exact; }} 
+                .no-print {{ display: none !important; }} 
+                .full-page-watermark {{ display: block !important; }}
+            }}
+            body {{ 
+                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif; 
+                background-color: white; 
+                color: #1c1c1e; 
+                font-size: 10pt; 
+                margin: 10mm; 
+                line-height: 1.2; 
+                position: relative;
+            }}
+            .container {{ max-width: 100%; box-sizing: border-box; position: relative; z-index: 1; }}
+            .header {{ text-align: center; margin-bottom: 8mm; padding-bottom: 4mm; border-bottom: 1px solid #d1d1d6; }}
+            .title {{ font-size: 16pt; font-weight: bold; margin: 0; text-transform: uppercase; color: #1c1c1e; }}
+            .date {{ font-size: 10pt; margin: 3mm 0; color: #8e8e93; }}
+            .columns {{ display: flex; justify-content: space-between; gap: 8mm; }}
+            .column {{ flex: 1; max-width: 48%; }}
+            .line-group {{ margin-bottom: 6mm; page-break-inside: avoid; }}
+            .line-title {{ font-size: 12pt; font-weight: 600; text-align: center; margin-bottom: 3mm; padding: 2mm 4mm; background-color: #f2f2f7; text-transform: uppercase; color: #1c1c1e; border-radius: 4px; }}
+            .pairs {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(80px, 1fr)); gap: 3mm; padding: 0 2mm; }}
+            .pair {{ padding: 3mm 4mm; border: 1px solid #d1d1d6; border-radius: 4px; font-size: 10pt; text-align: center; background-color: white; color: #1c1c1e; }}
+            .pair.down-station-item {{ background-color: #fdecea; color: #c0392b; border-color: #c0392b; }}
+            .empty-message {{ font-style: italic; color: #8e8e93; text-align: center; padding: 3mm; font-size: 10pt; grid-column: 1 / -1; }}
+
+            .full-page-watermark {{
+                position: fixed; 
+                top: 0;
+                left: 0;
+                width: 100%;
+                height: 100%;
+                z-index: -1;
+                pointer-events: none;
+                background-image: url('{_WATERMARK_DATA_URI}');
+                background-repeat: repeat;
+            }}
+        </style>
+    """.encode('utf-8')
+
+# Static document prelude, pre-encoded and split at the two places the date goes.
+_HTML_HEAD_OPEN: bytes = b"""
+    <!DOCTYPE html>
+    <html lang='en'>
+    <head>
+        <meta charset='UTF-8'>
+        <meta name='viewport' content='width=device-width, initial-scale=1.0'>
+        <title>Station Rotation - """
+
+_HTML_TITLE_CLOSE: bytes = b"""</title>
+"""
+
+_HTML_BODY_OPEN: bytes = b"""
+    </head>
+    <body>
+        <div class='full-page-watermark'></div>
+        <div class='container'>
+            <div class='header'> <div class='title'>Station Rotation</div> <div class='date'>Date: """
+
+_HTML_HEADER_CLOSE: bytes = b"""</div> </div>
+            <div class='columns'>
+"""
+
+_HTML_COLUMN_OPEN: bytes = b"""
+                <div class='column'>
+"""
+
+_HTML_COLUMN_CLOSE: bytes = b"""
+                </div>
+"""
+
+_HTML_FOOTER: bytes = b"""
+            </div>
+        </div>
+    </body>
+    </html>"""
+
+_HTML_EMPTY_LINE: bytes = b'<div class="empty-message">No pairs or unavailable stations</div>'
+_HTML_LINE_CLOSE: bytes = b'</div></div>'
+_HTML_LINE_OPEN: Dict[str, bytes] = {
+    line: f'<div class="line-group"><div class="line-title">Line {line}</div><div class="pairs">'.encode('utf-8')
+    for column_lines in HTML_COLUMNS for line in column_lines
+}
+_HTML_PAIR_OPEN: bytes = b'<div class="pair">'
+_HTML_DOWN_STATIONS_OPEN: bytes = b'<div class="pair down-station-item">'
+_HTML_DIV_CLOSE: bytes = b'</div>'
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def generate_print_friendly_html(date: str, schedule: Dict[str, List[str]], down_stations_data: Dict[str, List[int]]) -> bytes:
+    """
+    Generates the UTF-8 encoded HTML for the print-friendly report. Cached per (date, schedule, down stations).
+    Fragments are appended to one bytearray; only the date, pairs and down-station lists are encoded per call.
+    """
+    # `date` can be any caller-supplied string, so it is escaped once here rather than trusted.
+    date_bytes: bytes = html.escape(date).encode('utf-8')
+    html_buffer = bytearray(_HTML_HEAD_OPEN)
+    html_buffer += date_bytes
+    html_buffer += _HTML_TITLE_CLOSE
+    html_buffer += _CSS_HTML
+    html_buffer += _HTML_BODY_OPEN
+    html_buffer += date_bytes
+    html_buffer += _HTML_HEADER_CLOSE
+    for column_lines in HTML_COLUMNS:
+        html_buffer += _HTML_COLUMN_OPEN
+        for line_code in column_lines: 
+            html_buffer += _HTML_LINE_OPEN[line_code]
+            has_content_for_line: bool = False 
+            if schedule.get(line_code): 
+                # Pair labels come from rotation.PAIR_LABELS (see SAFE_PAIR_RE), so they cannot contain markup
+                # and no escaping is done on this per-pair path.
+                for pair_text in schedule[line_code]:
+                    html_buffer += _HTML_PAIR_OPEN
+                    html_buffer += pair_text.encode('ascii')
+                    html_buffer += _HTML_DIV_CLOSE
+                has_content_for_line = True
+            current_line_down_stations: List[int] = down_stations_data.get(line_code, [])
+            if current_line_down_stations:
+                html_buffer += _HTML_DOWN_STATIONS_OPEN
+                html_buffer += ', '.join(map(str, sorted(current_line_down_stations))).encode('ascii')
+                html_buffer += _HTML_DIV_CLOSE
+                has_content_for_line = True 
+            if not has_content_for_line: 
+                html_buffer += _HTML_EMPTY_LINE
+            html_buffer += _HTML_LINE_CLOSE
+        html_buffer += _HTML_COLUMN_CLOSE
+    html_buffer += _HTML_FOOTER
+    return bytes(html_buffer)
@@ -0,0 +1,67 @@
+"""
+Station pairing tables and helpers.
+
+Kept out of app.py on purpose: Streamlit re-executes the main script in a fresh module on every
+rerun, while an imported module is built once per process and cached in sys.modules. The lookup
+tables below and the compute_pairs cache therefore really are built once and shared by all sessions.
+"""
+import operator
+import re
+from functools import lru_cache, reduce
+from typing import List, Tuple, Iterable
+
+# --- Configuration Constants ---
+STATIONS: Tuple[int, ...] = tuple(range(1, 21))
+ALL_STATIONS_MASK: int = sum(1 << s for s in STATIONS)
+
+# --- Pairing Tables and Helpers ---
+# "a-b" labels for every station pair, indexed as PAIR_LABELS[a][b], so pairing never formats strings.
+PAIR_LABELS: List[List[str]] = [[f"{a}-{b}" for b in range(max(STATIONS) + 1)] for a in range(max(STATIONS) + 1)]
+# Every label is digits-dash-digits, which is why the HTML generator can emit pairs without escaping
+# (checked in tests/test_pairs.py).
+SAFE_PAIR_RE: re.Pattern[str] = re.compile(r'\A\d{1,2}-\d{1,2}\Z')
+
+def _build_mirror_indices(n: int) -> List[Tuple[int, int]]:
+    """Index pairs mirror_pair uses for n stations: first with last inwards, the odd middle paired with itself."""
+    index_pairs: List[Tuple[int, int]] = [(i, n - 1 - i) for i in range(n // 2)]
+    if n % 2 != 0:
+        index_pairs.append((n // 2, n // 2))
+    return index_pairs
+
+# A line never has more than len(STATIONS) operational stations, so every layout is built here once.
+MIRROR_INDICES: List[List[Tuple[int, int]]] = [_build_mirror_indices(n) for n in range(len(STATIONS) + 1)]
+
+def to_mask(stations: Iterable[int]) -> int:
+    """Builds a station bitmask in one pass; OR-ing makes duplicate stations harmless."""
+    return reduce(operator.or_, (1 << s for s in stations), 0)
+
+def stations_from_mask(mask: int) -> List[int]:
+    """Expands a station bitmask (bit s set = station s) into an ascending list of stations."""
+    stations: List[int] = []
+    while mask:
+        lowest_bit: int = mask & -mask
+        stations.append(lowest_bit.bit_length() - 1)
+        mask ^= lowest_bit
+    return stations
+
+def mirror_pair(sorted_stations: List[int]) -> List[str]:
+    """Pairs first with last, working inwards. `sorted_stations` must be unique and ascending."""
+    return [PAIR_LABELS[sorted_stations[a]][sorted_stations[b]] for a, b in MIRROR_INDICES[len(sorted_stations)]]
+
+@lru_cache(maxsize=256)
+def compute_pairs(line: str, non_op_mask: int, fixed_mask: int) -> Tuple[str, ...]:
+    """
+    Pair labels for one line given its non-operational and fixed station masks.
+    Pure in its (hashable) arguments, so repeat submissions with unchanged selections are a cache hit.
+    The cache lives in this imported module, so it persists across reruns and is shared by every session
+    in the server process.
+    """
+    operational_mask: int = ALL_STATIONS_MASK & ~non_op_mask
+    if line == 'C':
+        valid_fixed_mask: int = fixed_mask & ALL_STATIONS_MASK
+        pairs: List[str] = [PAIR_LABELS[s_fixed][s_fixed] for s_fixed in stations_from_mask(valid_fixed_mask)]
+        remaining_for_mirror_pairing_mask: int = operational_mask & ~valid_fixed_mask
+        if remaining_for_mirror_pairing_mask: 
+            pairs.extend(mirror_pair(stations_from_mask(remaining_for_mirror_pairing_mask)))
+        return tuple(pairs)
+    return tuple(mirror_pair(stations_from_mask(operational_mask)))
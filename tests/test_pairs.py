@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from rotation import ALL_STATIONS_MASK, PAIR_LABELS, SAFE_PAIR_RE, STATIONS, compute_pairs, to_mask
+
+
+def test_every_pair_label_is_safe_for_html():
+    for row in PAIR_LABELS:
+        for label in row:
+            assert SAFE_PAIR_RE.match(label), label
+
+
+@pytest.mark.parametrize("seed", range(50))
+@pytest.mark.parametrize("line", ("B", "C", "L", "M", "N", "O"))
+def test_compute_pairs_only_emits_safe_labels(line, seed):
+    rng = random.Random(seed)
+    non_op_mask = to_mask(rng.sample(STATIONS, rng.randint(0, len(STATIONS))))
+    fixed_mask = to_mask(rng.sample(STATIONS, rng.randint(0, 3))) if line == 'C' else 0
+    for label in compute_pairs(line, non_op_mask, fixed_mask):
+        assert SAFE_PAIR_RE.match(label), label
+
+
+def test_compute_pairs_mirrors_all_stations():
+    pairs = compute_pairs('B', 0, 0)
+    assert pairs[0] == "1-20"
+    assert pairs[-1] == "10-11"
+    assert len(pairs) == len(STATIONS) // 2
+
+
+def test_compute_pairs_puts_fixed_c_stations_first():
+    pairs = compute_pairs('C', to_mask([1, 20]), to_mask([5]))
+    assert pairs[0] == "5-5"
+    assert "5-5" not in pairs[1:]
+    assert all(SAFE_PAIR_RE.match(label) for label in pairs)
+
+
+def test_compute_pairs_with_every_station_down_is_empty():
+    assert compute_pairs('C', ALL_STATIONS_MASK, 0) == ()